@@ -1,10 +1,26 @@
-"""Scrapy spider for collecting wholesale supplier data with BeautifulSoup."""
+"""Scrapy spider for collecting wholesale supplier data with parsel selectors."""
+
+import re
+from urllib.parse import urlsplit
 
 import scrapy
-import sqlite3
-import json
+from lxml.etree import XPath
 from scrapy_splash import SplashRequest
-from bs4 import BeautifulSoup
+
+from exporters import OrjsonLinesItemExporter
+from pipelines import SqlitePipeline
+
+
+def _has_class(name):
+    """Build an XPath predicate matching elements carrying a CSS class.
+
+    Args:
+        name (str): Class name to match.
+
+    Returns:
+        str: XPath predicate equivalent to the CSS ``.name`` selector.
+    """
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
 
 
 class WholesaleSpider(scrapy.Spider):
@@ -17,9 +33,54 @@ class WholesaleSpider(scrapy.Spider):
         "https://www.wholesalecentral.com/electronics.htm",
         "https://www.dhgate.com/wholesale/drones.html",
     ]
+    # Hosts whose listings are rendered client-side and need Splash.
+    splash_hosts = ("alibaba.com", "dhgate.com")
+    custom_settings = {
+        "ITEM_PIPELINES": {SqlitePipeline: 300},
+        "FEED_EXPORTERS": {
+            "jsonl": OrjsonLinesItemExporter,
+            "jsonlines": OrjsonLinesItemExporter,
+        },
+        # UTF-8 feeds (Scrapy's project default) let the orjson exporter apply.
+        "FEED_EXPORT_ENCODING": "utf-8",
+        # Splash renders are slow, so keep more requests in flight and let
+        # AutoThrottle back off per domain.
+        "CONCURRENT_REQUESTS": 32,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 8,
+        "AUTOTHROTTLE_ENABLED": True,
+        "AUTOTHROTTLE_TARGET_CONCURRENCY": 4,
+        "DOWNLOAD_DELAY": 0.25,
+        # On-disk cache for development re-runs; off unless the crawl is run
+        # with -s HTTPCACHE_ENABLED=1. Rendered pages are kept for a day.
+        "HTTPCACHE_EXPIRATION_SECS": 86400,
+        "HTTPCACHE_DIR": "httpcache",
+        "HTTPCACHE_STORAGE": "scrapy_splash.SplashAwareFSCacheStorage",
+        "HTTPCACHE_POLICY": "scrapy.extensions.httpcache.DummyPolicy",
+        "HTTPCACHE_IGNORE_HTTP_CODES": [400, 403, 404, 408, 429, 500, 502, 503, 504],
+    }
+
+    # Field selectors compiled once per class and evaluated on product elements.
+    # Each returns the whitespace-normalised text of the first match, or "".
+    _XP_NAME = XPath("normalize-space(.//h2)")
+    _XP_PRICE = XPath(f"normalize-space(.//span[{_has_class('price')}])")
+    _XP_CONTACT = XPath(f"string(.//a[{_has_class('contact-link')}]/@href)")
+    _XP_ADDRESS = XPath(f"normalize-space(.//span[{_has_class('address')}])")
+    _XP_RESALE = XPath(f"normalize-space(.//div[{_has_class('resale-policy')}])")
+    _XP_REVIEWS = XPath(f"normalize-space(.//span[{_has_class('review-count')}])")
+    _XP_RATING = XPath(f"normalize-space(.//span[{_has_class('rating')}])")
+    _XP_YEARS = XPath(f"normalize-space(.//span[{_has_class('years-active')}])")
+
+    # Plain decimal number, e.g. "4" or "4.5".
+    _NUM_RE = re.compile(r"\d+(?:\.\d+)?")
+
+    # Largest value SQLite can store in an INTEGER column.
+    _SQLITE_INT_MAX = 2**63 - 1
+
+    # All resale policy phrases, matched in a single scan of the text.
+    _RESALE_RE = re.compile("Authorized Reseller|Bulk Orders Allowed|No Resale")
 
     def __init__(self, db_name="wholesale.db", *args, **kwargs):
-        """Initialize spider and SQLite database.
+        """Initialize spider.
 
         Args:
             db_name (str): Name of the SQLite database file (default: 'wholesale.db').
@@ -27,36 +88,28 @@ class WholesaleSpider(scrapy.Spider):
             **kwargs: Arbitrary keyword arguments.
         """
         super().__init__(*args, **kwargs)
-        try:
-            self.conn = sqlite3.connect(db_name)
-            self.cursor = self.conn.cursor()
-            self.cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS suppliers (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    category TEXT,
-                    store_name TEXT,
-                    price TEXT,
-                    contact TEXT,
-                    address TEXT,
-                    resale_status TEXT,
-                    trust_score INTEGER,
-                    date_scraped DATE DEFAULT CURRENT_TIMESTAMP
-                )
-                """
-            )
-            self.conn.commit()
-        except sqlite3.Error as e:
-            self.log(f"Database initialization error: {e}")
+        self.db_name = db_name
 
     def start_requests(self):
-        """Generate Splash requests for start URLs.
+        """Generate requests for start URLs.
 
         Yields:
-            SplashRequest: Request for each URL with JavaScript rendering.
+            SplashRequest: Request with JavaScript rendering for Splash hosts.
+            scrapy.Request: Plain request for server-rendered pages.
         """
         for url in self.start_urls:
-            yield SplashRequest(url, self.parse, args={"wait": 2.0})
+            host = urlsplit(url).hostname or ""
+            if any(
+                host == splash_host or host.endswith("." + splash_host)
+                for splash_host in self.splash_hosts
+            ):
+                yield SplashRequest(
+                    url,
+                    self.parse,
+                    args={"wait": 1.0, "timeout": 30, "resource_timeout": 10},
+                )
+            else:
+                yield scrapy.Request(url, self.parse)
 
     def parse(self, response):
         """Parse response and extract product data.
@@ -67,99 +120,72 @@ class WholesaleSpider(scrapy.Spider):
         Yields:
             dict: Scraped item data.
         """
-        soup = BeautifulSoup(response.text, "html.parser")
-        for product in soup.select("div.product-card"):
-            item = self._extract_product_data(product, response.url)
+        url = response.url
+        category = url.rsplit("/", 1)[-1]
+        # Walk the parsed tree lazily instead of materializing every card.
+        for product in response.selector.root.iter("div"):
+            if "product-card" not in (product.get("class") or "").split():
+                continue
+            item = self._extract_product_data(product, url, category)
             if item:
-                self._save_to_database(item)
-                print("Scraped Item:")
-                print(json.dumps(item, indent=2))
-                print("-" * 50)
+                self.logger.debug("scraped %s", item["store_name"])
                 yield item
 
-    def _extract_product_data(self, product, url):
-        """Extract product data from BeautifulSoup element.
+    def _extract_product_data(self, product, url, category):
+        """Extract product data from a product element.
 
         Args:
-            product: BeautifulSoup element representing a product.
+            product: lxml element representing a product.
             url (str): Source URL of the product.
+            category (str): Category derived from the last URL path segment.
 
         Returns:
-            dict: Extracted item data, or None if extraction fails.
+            dict: Extracted item data, or None if the card has no store name
+                or extraction fails.
         """
         try:
+            # Cards without a store name are ads or filter stubs.
+            store_name = self._XP_NAME(product)
+            if not store_name:
+                return None
+            # Raw trust signals; the score itself is a generated SQLite column.
+            reviews = self._XP_REVIEWS(product)
+            rating = self._XP_RATING(product)
+            years = self._XP_YEARS(product)
             item = {
-                "category": url.split("/")[-1],
+                "category": category,
                 "store_url": url,
+                "store_name": store_name,
+                "price": self._XP_PRICE(product) or "N/A",
+                "contact": self._XP_CONTACT(product) or "N/A",
+                "address": self._XP_ADDRESS(product) or "N/A",
+                "resale_status": self._determine_resale_status(
+                    self._XP_RESALE(product)
+                ),
+                "review_count": self._parse_count(reviews),
+                "rating": float(rating) if self._NUM_RE.fullmatch(rating) else None,
+                "years_active": self._parse_count(years),
             }
-            item["store_name"] = self._get_text(product, "h2")
-            item["price"] = self._get_text(product, "span", class_="price")
-            item["contact"] = self._get_attribute(product, "a", "contact-link", "href")
-            item["address"] = self._get_text(product, "span", class_="address")
-            resale_terms = self._get_text(product, "div", class_="resale-policy")
-            item["resale_status"] = self._determine_resale_status(resale_terms)
-            item["trust_score"] = self._calculate_trust_score(product)
             return item
         except (AttributeError, TypeError) as e:
             self.log(f"Error extracting product data: {e}")
             return None
 
-    def _get_text(self, element, tag, **kwargs):
-        """Extract text from a BeautifulSoup element.
-
-        Args:
-            element: BeautifulSoup element to search.
-            tag (str): HTML tag to find.
-            **kwargs: Additional attributes (e.g., class_).
-
-        Returns:
-            str: Extracted text or "N/A" if not found.
-        """
-        found = element.find(tag, **kwargs)
-        return found.get_text(strip=True) if found else "N/A"
-
-    def _get_attribute(self, element, tag, class_name, attr):
-        """Extract attribute from a BeautifulSoup element.
+    def _parse_count(self, text):
+        """Parse a whole-number field for an SQLite INTEGER column.
 
         Args:
-            element: BeautifulSoup element to search.
-            tag (str): HTML tag to find.
-            class_name (str): Class name of the element.
-            attr (str): Attribute to extract.
+            text (str): Normalised field text.
 
         Returns:
-            str: Attribute value or "N/A" if not found.
+            int: Parsed value, or None if not a whole number or too large to
+                store in SQLite.
         """
-        found = element.find(tag, class_=class_name)
-        return found[attr] if found and attr in found.attrs else "N/A"
-
-    def _save_to_database(self, item):
-        """Save item to SQLite database.
-
-        Args:
-            item (dict): Item data to save.
-        """
-        try:
-            self.cursor.execute(
-                """
-                INSERT INTO suppliers (
-                    category, store_name, price, contact, address,
-                    resale_status, trust_score
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    item["category"],
-                    item["store_name"],
-                    item["price"],
-                    item["contact"],
-                    item["address"],
-                    item["resale_status"],
-                    item["trust_score"],
-                ),
-            )
-            self.conn.commit()
-        except sqlite3.Error as e:
-            self.log(f"Database save error: {e}")
+        # 19 digits covers 2**63 - 1 and keeps int() clear of the digit limit.
+        if not text.isdecimal() or len(text) > 19:
+            return None
+        value = int(text)
+        return value if value <= self._SQLITE_INT_MAX else None
 
     def _determine_resale_status(self, resale_terms):
         """Determine resale status from terms.
@@ -172,80 +198,8 @@ class WholesaleSpider(scrapy.Spider):
         """
         if not resale_terms:
             return "Unknown"
-        if "Authorized Reseller" in resale_terms or "Bulk Orders Allowed" in resale_terms:
-            return "Resale Approved"
-        if "No Resale" in resale_terms:
-            return "Restricted"
-        return "Unknown"
-
-    def _calculate_trust_score(self, product):
-        """Calculate trust score based on reviews, rating, and years active.
-
-        Args:
-            product: BeautifulSoup element representing a product.
-
-        Returns:
-            int: Trust score (0-10).
-        """
-        score = 0
-        score += self._score_reviews(product)
-        score += self._score_rating(product)
-        score += self._score_years_active(product)
-        return min(score, 10)
-
-    def _score_reviews(self, product):
-        """Score reviews based on count.
-
-        Args:
-            product: BeautifulSoup element.
-
-        Returns:
-            int: Score contribution (0 or 3).
-        """
-        try:
-            reviews = self._get_text(product, "span", class_="review-count")
-            return 3 if reviews != "N/A" and int(reviews) > 100 else 0
-        except ValueError:
-            return 0
-
-    def _score_rating(self, product):
-        """Score rating based on value.
-
-        Args:
-            product: BeautifulSoup element.
-
-        Returns:
-            int: Score contribution (0 or 5).
-        """
-        try:
-            rating = self._get_text(product, "span", class_="rating")
-            return 5 if rating != "N/A" and float(rating) > 4.0 else 0
-        except ValueError:
-            return 0
-
-    def _score_years_active(self, product):
-        """Score years active based on value.
-
-        Args:
-            product: BeautifulSoup element.
-
-        Returns:
-            int: Score contribution (0 or 2).
-        """
-        try:
-            years = self._get_text(product, "span", class_="years-active")
-            return 2 if years != "N/A" and int(years) > 5 else 0
-        except ValueError:
-            return 0
-
-    def close_spider(self, spider):
-        """Close the SQLite database connection.
-
-        Args:
-            spider: Scrapy spider instance.
-        """
-        try:
-            self.conn.commit()
-            self.conn.close()
-        except sqlite3.Error as e:
-            self.log(f"Database close error: {e}")
+        found = set(self._RESALE_RE.findall(resale_terms))
+        if not found:
+            return "Unknown"
+        # Approval phrases win over "No Resale" wherever they appear.
+        return "Restricted" if found == {"No Resale"} else "Resale Approved"
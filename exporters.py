@@ -0,0 +1,55 @@
+"""Feed exporter that serializes scraped items with orjson when available."""
+
+import codecs
+
+from scrapy.exporters import JsonLinesItemExporter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+class OrjsonLinesItemExporter(JsonLinesItemExporter):
+    """JSON Lines exporter that writes each item with orjson.
+
+    orjson always emits unescaped UTF-8 and takes no encoder options, so it is
+    only used when the feed is UTF-8 with default options. Otherwise, and for
+    any value orjson cannot serialize, Scrapy's stdlib-based exporter is used.
+    """
+
+    def __init__(self, file, **kwargs):
+        """Initialize the exporter.
+
+        Args:
+            file: Binary file object the feed is written to.
+            **kwargs: Exporter options, as for JsonLinesItemExporter.
+        """
+        super().__init__(file, **kwargs)
+        self._use_orjson = (
+            orjson is not None
+            and self.encoding is not None
+            and codecs.lookup(self.encoding).name == "utf-8"
+            and not self.indent
+            and self._kwargs == {"ensure_ascii": False}
+        )
+        # Renamed from _get_serialized_fields in newer Scrapy releases.
+        self._serialized_fields = getattr(
+            self, "get_serialized_fields", None
+        ) or getattr(self, "_get_serialized_fields")
+
+    def export_item(self, item):
+        """Write one item as a JSON line.
+
+        Args:
+            item: Scraped item to export.
+        """
+        if not self._use_orjson:
+            return super().export_item(item)
+        itemdict = dict(self._serialized_fields(item))
+        try:
+            data = orjson.dumps(itemdict, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            # e.g. integers beyond 64 bits or types only ScrapyJSONEncoder knows.
+            return super().export_item(item)
+        self.file.write(data)
@@ -0,0 +1,326 @@
+"""Item pipeline that writes scraped supplier data to SQLite off the reactor thread."""
+
+import queue
+import sqlite3
+import threading
+
+from twisted.internet.threads import deferToThread
+
+# Number of buffered items written per database transaction.
+FLUSH_SIZE = 500
+
+# Seconds the writer waits for new items before flushing a partial batch.
+FLUSH_INTERVAL = 1.0
+
+# Upper bound on items waiting for the writer; a full queue slows the crawl.
+QUEUE_SIZE = 1000
+
+# WAL journaling with relaxed sync; acceptable durability for scraped data.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+# trust_score is computed by SQLite (generated columns need 3.31+).
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS suppliers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        category TEXT,
+        store_name TEXT,
+        price TEXT,
+        contact TEXT,
+        address TEXT,
+        resale_status TEXT,
+        review_count INTEGER,
+        rating REAL,
+        years_active INTEGER,
+        trust_score INTEGER GENERATED ALWAYS AS (
+            MIN(
+                10,
+                (CASE WHEN review_count > 100 THEN 3 ELSE 0 END)
+                + (CASE WHEN rating > 4.0 THEN 5 ELSE 0 END)
+                + (CASE WHEN years_active > 5 THEN 2 ELSE 0 END)
+            )
+        ) VIRTUAL,
+        date_scraped DATE DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# Columns carried over when migrating a table from the pre-typed-column schema.
+LEGACY_COLUMNS = (
+    "id, category, store_name, price, contact, address, resale_status, date_scraped"
+)
+
+# Keeps the first row of each (category, store_name) pair, as the insert does,
+# so older databases with repeated scrapes can take the unique index.
+DEDUPE_SQL = """
+    DELETE FROM suppliers
+    WHERE id NOT IN (
+        SELECT MIN(id) FROM suppliers GROUP BY category, store_name
+    )
+"""
+
+# Needed during the load so the insert can detect duplicate suppliers.
+UNIQUE_INDEX_SQL = """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_suppliers_store_unique
+    ON suppliers(category, store_name)
+"""
+
+# Shared statement text so sqlite3 reuses the cached prepared statement.
+# A duplicate supplier keeps its first row, except that rows with no trust
+# signals yet (e.g. migrated from the old schema) take the new ones.
+INSERT_SQL = """
+    INSERT INTO suppliers (
+        category, store_name, price, contact, address,
+        resale_status, review_count, rating, years_active
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (category, store_name) DO UPDATE SET
+        review_count = excluded.review_count,
+        rating = excluded.rating,
+        years_active = excluded.years_active
+    WHERE suppliers.review_count IS NULL
+        AND suppliers.rating IS NULL
+        AND suppliers.years_active IS NULL
+"""
+
+# Created after the bulk load so inserts skip index maintenance.
+INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_suppliers_date ON suppliers(date_scraped)",
+)
+
+# Queue marker telling the writer thread to finish up and exit.
+_STOP = object()
+
+
+class SqlitePipeline:
+    """Pipeline that batches items into SQLite from a background writer thread."""
+
+    def open_spider(self, spider):
+        """Start the writer thread for the spider's database.
+
+        Args:
+            spider: Scrapy spider instance; ``db_name`` selects the database file.
+        """
+        self.spider = spider
+        self.db_name = getattr(spider, "db_name", "wholesale.db")
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._writer_lost = False
+        self._writer = threading.Thread(
+            target=self._run, name="sqlite-writer", daemon=True
+        )
+        self._writer.start()
+
+    def process_item(self, item, spider):
+        """Hand the item's row to the writer thread.
+
+        Args:
+            item (dict): Item data to save.
+            spider: Scrapy spider instance.
+
+        Returns:
+            dict: The unchanged item.
+        """
+        self._enqueue(
+            (
+                item["category"],
+                item["store_name"],
+                item["price"],
+                item["contact"],
+                item["address"],
+                item["resale_status"],
+                item["review_count"],
+                item["rating"],
+                item["years_active"],
+            )
+        )
+        return item
+
+    def close_spider(self, spider):
+        """Stop the writer thread without blocking the reactor.
+
+        Args:
+            spider: Scrapy spider instance.
+
+        Returns:
+            Deferred: Fires once the writer has flushed, indexed and closed
+                the database.
+        """
+        return deferToThread(self._stop_writer)
+
+    def _stop_writer(self):
+        """Send the stop marker and wait for the writer thread to exit."""
+        self._enqueue(_STOP)
+        self._writer.join()
+
+    def _enqueue(self, row):
+        """Queue a row for the writer without blocking on a dead writer thread.
+
+        Args:
+            row: Row tuple, or the stop marker.
+
+        Returns:
+            bool: True if the row was queued, False if the writer has stopped.
+        """
+        while self._writer.is_alive():
+            try:
+                self._queue.put(row, timeout=FLUSH_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        if not self._writer_lost:
+            self._writer_lost = True
+            self.spider.logger.error(
+                f"SQLite writer for {self.db_name} is not running; "
+                "items are not being saved to the database"
+            )
+        return False
+
+    def _run(self):
+        """Consume rows from the queue and write them in batches.
+
+        Runs on the writer thread, which owns the SQLite connection.
+        """
+        try:
+            # Autocommit mode; _flush opens and commits each batch transaction.
+            self.conn = sqlite3.connect(
+                self.db_name, isolation_level=None, cached_statements=256
+            )
+            for pragma in SQLITE_PRAGMAS:
+                self.conn.execute(pragma)
+            self._prepare_schema()
+            self._create_unique_index()
+        except sqlite3.Error as e:
+            self.spider.logger.error(f"Database initialization error: {e}")
+            return
+
+        pending = []
+        try:
+            while True:
+                try:
+                    row = self._queue.get(timeout=FLUSH_INTERVAL)
+                except queue.Empty:
+                    self._flush(pending)
+                    continue
+                if row is _STOP:
+                    break
+                pending.append(row)
+                if len(pending) >= FLUSH_SIZE:
+                    self._flush(pending)
+        except Exception:
+            self.spider.logger.exception("SQLite writer stopped unexpectedly")
+        finally:
+            try:
+                self._flush(pending)
+                for statement in INDEX_SQL:
+                    self.conn.execute(statement)
+                self.conn.execute("ANALYZE")
+            except Exception as e:
+                self.spider.logger.error(f"Database close error: {e}")
+            finally:
+                self.conn.close()
+
+    def _prepare_schema(self):
+        """Create the suppliers table, migrating one from the old schema.
+
+        Raises:
+            sqlite3.Error: If the schema cannot be created or migrated.
+        """
+        if sqlite3.sqlite_version_info < (3, 31, 0):
+            raise sqlite3.NotSupportedError(
+                "SQLite 3.31+ is required for the generated trust_score column "
+                f"(found {sqlite3.sqlite_version})"
+            )
+        columns = {
+            row[1] for row in self.conn.execute("PRAGMA table_info(suppliers)")
+        }
+        if columns and "review_count" not in columns:
+            self._migrate_legacy_table()
+        self.conn.execute(CREATE_TABLE_SQL)
+
+    def _migrate_legacy_table(self):
+        """Rebuild a suppliers table created with the old stored trust_score.
+
+        The old schema never recorded review counts, ratings or years active,
+        so migrated rows keep their other data but drop the stored score. They
+        score 0 until the same supplier is scraped again and INSERT_SQL fills
+        in its trust signals.
+        """
+        self.spider.logger.warning(
+            f"Migrating suppliers table in {self.db_name} to the typed-column "
+            "schema; stored trust_score values are discarded and existing rows "
+            "score 0 until the same supplier is scraped again"
+        )
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute("ALTER TABLE suppliers RENAME TO suppliers_legacy")
+            self.conn.execute(CREATE_TABLE_SQL)
+            self.conn.execute(
+                f"INSERT INTO suppliers ({LEGACY_COLUMNS}) "
+                f"SELECT {LEGACY_COLUMNS} FROM suppliers_legacy"
+            )
+            self.conn.execute("DROP TABLE suppliers_legacy")
+            self.conn.execute("COMMIT")
+        except sqlite3.Error:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            raise
+
+    def _create_unique_index(self):
+        """Create the unique supplier index, removing duplicate rows first.
+
+        Raises:
+            sqlite3.Error: If the duplicates cannot be removed or indexed.
+        """
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master "
+            "WHERE type = 'index' AND name = 'idx_suppliers_store_unique'"
+        ).fetchone()
+        if exists:
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            removed = self.conn.execute(DEDUPE_SQL).rowcount
+            self.conn.execute(UNIQUE_INDEX_SQL)
+            self.conn.execute("COMMIT")
+        except sqlite3.Error:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            raise
+        if removed:
+            self.spider.logger.warning(
+                f"Removed {removed} duplicate supplier rows from {self.db_name} "
+                "before creating the unique (category, store_name) index"
+            )
+
+    def _flush(self, pending):
+        """Write buffered rows to the database in a single transaction.
+
+        Any failure rolls the batch back and is logged, so a bad row costs
+        one batch rather than the writer thread.
+
+        Args:
+            pending (list): Buffered row tuples; cleared after the write.
+        """
+        if not pending:
+            return
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany(INSERT_SQL, pending)
+            self.conn.execute("COMMIT")
+        except Exception as e:
+            # One bad batch is dropped; the writer keeps running.
+            if isinstance(e, sqlite3.Error):
+                message = f"Database save error: {e}"
+            else:
+                message = f"Unexpected error saving batch: {e!r}"
+            self.spider.logger.error(f"{message}; {len(pending)} rows discarded")
+            try:
+                if self.conn.in_transaction:
+                    self.conn.rollback()
+            except sqlite3.Error as rollback_error:
+                self.spider.logger.error(f"Database rollback error: {rollback_error}")
+        finally:
+            pending.clear()